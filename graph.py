@@ -10,12 +10,74 @@ FB_GRAPH_URL = 'https://graph.facebook.com/{version}/{node}'
 FB_GRAPH_VERSIONS = ['2.2', '2.3', '2.4', '2.5', '2.6', '2.7', '2.8']
 FB_GRAPH_DEFAULT_VERSION = FB_GRAPH_VERSIONS[-1]
 
+# Base url of every known version.
+FB_GRAPH_VERSION_URLS = dict(
+    (version, FB_GRAPH_URL.format(version='v' + version, node=''))
+    for version in FB_GRAPH_VERSIONS)
+
+# Endpoints (last path component of a node) pinned to a given version.
+FB_GRAPH_ENDPOINT_VERSIONS = {
+    'groups': '2.3',    # empty since 2.4
+}
+
+# Error codes returned when the requested endpoint (or one of its fields)
+# is deprecated for the requested version, older versions may still serve it.
+FB_GRAPH_ENDPOINT_DEPRECATION_CODES = (12,)
+
+# Error codes returned when the requested version itself is deprecated,
+# older versions are deprecated as well so the default (newer) version
+# is requested instead.
+FB_GRAPH_VERSION_DEPRECATION_CODES = (2635,)
+
+# Maximum number of older versions tried after an endpoint deprecation.
+FB_GRAPH_MAX_FALLBACKS = 3
+
 
 def is_iterable(obj):
     return (isinstance(obj, list) or 
             isinstance(obj, tuple))
 
 
+def graph_url(node, version):
+    """
+    Return the url of the given node for the given graph version.
+    """
+
+    base = FB_GRAPH_VERSION_URLS.get(version)
+
+    if base is None:
+        return FB_GRAPH_URL.format(version='v' + version, node=node)
+
+    return base + node
+
+
+def version_key(version):
+    """
+    Return a sortable (major, minor) tuple for the given graph
+    version, or None if it cannot be parsed.
+    """
+
+    try:
+        return tuple(int(part) for part in version.split('.'))
+
+    except (AttributeError, ValueError):
+        return None
+
+
+def graph_endpoint(node):
+    """
+    Return the endpoint name of the given node used as a key
+    in the version routing table, or '' for a bare node.
+    """
+
+    parts = node.strip('/').split('/')
+
+    if len(parts) > 1:
+        return parts[-1]
+
+    return ''
+
+
 class FBGraphError(Exception):
     """
     """
@@ -33,6 +95,21 @@ class FBGraphError(Exception):
         
         super(FBGraphError, self).__init__(self.message)
 
+    def is_endpoint_deprecation(self):
+        """
+        Whether the error reports an endpoint deprecated
+        for the requested version.
+        """
+
+        return self.code in FB_GRAPH_ENDPOINT_DEPRECATION_CODES
+
+    def is_version_deprecation(self):
+        """
+        Whether the error reports a deprecated version.
+        """
+
+        return self.code in FB_GRAPH_VERSION_DEPRECATION_CODES
+
 
 class FBGraph(object):
     """
@@ -41,17 +118,97 @@ class FBGraph(object):
 
     def __init__(self, access_token,
                        session=requests.Session(), 
-                       version=FB_GRAPH_DEFAULT_VERSION):
+                       version=FB_GRAPH_DEFAULT_VERSION,
+                       routes=None,
+                       versions=None):
+        """
+        parameters
+            routes      A dict mapping endpoint names to the graph
+                        version they should be requested with.
+                        [see: FB_GRAPH_ENDPOINT_VERSIONS]
+
+            versions    A list of graph versions to be known in 
+                        addition to FB_GRAPH_VERSIONS, used as
+                        fallbacks when negotiating a version.
+        """
         super(FBGraph, self).__init__()
 
         self.access_token = access_token
         self.version = version
         self.session = session
 
+        self.routes = dict(FB_GRAPH_ENDPOINT_VERSIONS)
+
+        if routes is not None:
+            self.routes.update(routes)
+
+        self.versions = set(FB_GRAPH_VERSIONS)
+
+        if versions is not None:
+            self.versions.update(versions)
+
+        # versions negotiated after a deprecation error, 
+        # per (endpoint, fields) requested.
+        self.negotiated_versions = dict()
+
+        # (endpoint, fields) for which no fallback version succeeded.
+        self.exhausted_endpoints = set()
+
+        # versions reported as deprecated by the server.
+        self.deprecated_versions = set()
+
     def setAccessToken(self, access_token):
 
         self.access_token = access_token
 
+    def resolve_version(self, node, version=None, 
+                              fields=None, negotiated=True):
+        """
+        Return the graph version to be used for the given node.
+
+        An explicit version always wins, then the version negotiated
+        for the node endpoint and requested fields (unless negotiated
+        is False), then the routing table and finally the default
+        version.  A deprecated version is replaced by the default one.
+        """
+
+        if version is not None:
+            return version
+
+        endpoint = graph_endpoint(node)
+        key = (endpoint, fields)
+
+        if negotiated and key in self.negotiated_versions:
+            version = self.negotiated_versions[key]
+
+        else:
+            version = self.routes.get(endpoint, self.version)
+
+        if version in self.deprecated_versions:
+            return self.version
+
+        return version
+
+    def _fallback_versions(self, version):
+        """
+        Return at most FB_GRAPH_MAX_FALLBACKS known versions older
+        than the given one, the newest first.
+        """
+
+        current = version_key(version)
+
+        if current is None:
+            return []
+
+        older = [v for v in self.versions 
+                   if v not in self.deprecated_versions and 
+                      version_key(v) is not None and 
+                      version_key(v) < current]
+
+        older.sort(key=version_key, reverse=True)
+
+        return older[:FB_GRAPH_MAX_FALLBACKS]
+
     def get(self, node, params=None, version=None):
         """
         Request the given graph node and return
@@ -65,6 +222,24 @@ class FBGraph(object):
 
                         Mandatory parameters include:
                             access_token
+
+            version     The Graph version to be used.
+
+                        If not given the version is resolved
+                        through resolve_version() and:
+
+                        - when the endpoint (or a requested field)
+                          is reported as deprecated, up to 
+                          FB_GRAPH_MAX_FALLBACKS older versions are
+                          tried in turn.  The first one to succeed is
+                          remembered for the endpoint and fields, if
+                          none does they are not negotiated again.
+
+                        - when the version itself is reported as
+                          deprecated, it is remembered and the default
+                          version is requested instead.
+
+                        Bare nodes (e.g. 'me') are never negotiated.
         """
 
         if params is None:
@@ -75,13 +250,62 @@ class FBGraph(object):
         
         params['format'] = 'json'
 
-        if version is None:
-            version = self.version
+        if version is not None:
+            return self._get(graph_url(node, version), params)
+
+        endpoint = graph_endpoint(node)
+        key = (endpoint, params.get('fields'))
 
-        version = 'v' + version
+        version = self.resolve_version(node, fields=key[1])
 
-        url = FB_GRAPH_URL.format(version=version, 
-                                  node=node)
+        try:
+            return self._get(graph_url(node, version), params)
+
+        except FBGraphError as e:
+
+            if e.is_version_deprecation() and version != self.version:
+                self.deprecated_versions.add(version)
+
+                return self._get(graph_url(node, self.version), params)
+
+            if (not e.is_endpoint_deprecation() or 
+                    not endpoint or 
+                    key in self.exhausted_endpoints):
+                raise
+
+            error = e
+
+        for fallback in self._fallback_versions(version):
+
+            try:
+                result = self._get(graph_url(node, fallback), params)
+
+            except FBGraphError as e:
+
+                if e.is_version_deprecation():
+                    self.deprecated_versions.add(fallback)
+                    break
+
+                if not e.is_endpoint_deprecation():
+                    raise
+
+                continue
+
+            self.negotiated_versions[key] = fallback
+
+            return result
+
+        self.exhausted_endpoints.add(key)
+
+        raise error
+
+    def _get(self, url, params):
+        """
+        Request the given url following the pages of the
+        response if any.
+        """
+
+        params = dict(params)
 
         result = None
         
@@ -289,7 +513,9 @@ class FBGraph(object):
         by the user whose id is given by the node parameter.
 
         note:   (1) since graph version 2.4 this does not 
-                    work anymore and the result will be empty.
+                    work anymore and the result will be empty,
+                    the endpoint is routed to version 2.3.
+                    [see: FB_GRAPH_ENDPOINT_VERSIONS]
 
                 (2) becareful, this will most probably work just
                     for the current user whose token is used.
@@ -307,8 +533,7 @@ class FBGraph(object):
         #     { 'id':'7777777777', 'name':'group 7', 'privacy':'OPEN', 'description':'group 7' },
         # ]
 
-        return self.get_fields(node + '/groups', fields, 
-                               version='2.3')
+        return self.get_fields(node + '/groups', fields)
 
     def get_user_pages(self, node='me', 
                        fields=['id', 'name', 'about', 'access_token']):
@@ -428,13 +653,10 @@ class FBGraph(object):
         if 'access_token' not in post_args:
             post_args['access_token'] = self.access_token
 
-        if version is None:
-            version = self.version
+        version = self.resolve_version(node, version, 
+                                       negotiated=False)
 
-        version = 'v' + version
-
-        url = FB_GRAPH_URL.format(version=version,
-                                  node=node)
+        url = graph_url(node, version)
 
         try:
             response = self.session.post(url, 
@@ -640,13 +862,10 @@ class FBGraph(object):
         
         params['format'] = 'json'
 
-        if version is None:
-            version = self.version
-
-        version = 'v' + version
+        version = self.resolve_version(node, version, 
+                                       negotiated=False)
 
-        url = FB_GRAPH_URL.format(version=version, 
-                                  node=node)
+        url = graph_url(node, version)
 
         try:
             response = self.session.delete(url, params=params)
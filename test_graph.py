@@ -0,0 +1,241 @@
+#!/usr/bin/env python
+#-*- coding: utf-8 -*-
+
+import unittest
+
+from graph import (FBGraph, FBGraphError, graph_url, graph_endpoint,
+                   version_key, FB_GRAPH_VERSION_URLS,
+                   FB_GRAPH_MAX_FALLBACKS)
+
+
+ENDPOINT_DEPRECATED = {'error': {'message': 'deprecated endpoint',
+                                 'code': 12,
+                                 'type': 'OAuthException'}}
+
+VERSION_DEPRECATED = {'error': {'message': 'deprecated version',
+                                'code': 2635,
+                                'type': 'OAuthException'}}
+
+
+class FakeResponse(object):
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return dict(self.data)
+
+
+class FakeSession(object):
+    """
+    Answer every request with the response registered for its
+    (version, fields) or its version, or a successful one, and
+    record the requested urls.
+    """
+
+    def __init__(self, responses=None):
+        self.responses = responses or dict()
+        self.urls = []
+
+    def get(self, url, params=None):
+        self.urls.append(url)
+
+        version = url.split('/')[3][1:]
+        fields = params.get('fields') if params else None
+
+        response = self.responses.get((version, fields), 
+                   self.responses.get(version, {'id': version}))
+
+        return FakeResponse(response)
+
+    def post(self, url, params=None, data=None, files=None):
+        self.urls.append(url)
+
+        return FakeResponse({'id': '1'})
+
+    def delete(self, url, params=None):
+        self.urls.append(url)
+
+        return FakeResponse({'success': True})
+
+    def versions(self):
+        return [url.split('/')[3][1:] for url in self.urls]
+
+
+class GraphHelpersTest(unittest.TestCase):
+
+    def test_graph_url(self):
+        self.assertEqual(graph_url('me/feed', '2.8'),
+                         'https://graph.facebook.com/v2.8/me/feed')
+
+    def test_graph_url_unknown_version(self):
+        self.assertEqual(graph_url('me', '9.9'),
+                         'https://graph.facebook.com/v9.9/me')
+        self.assertNotIn('9.9', FB_GRAPH_VERSION_URLS)
+
+    def test_graph_endpoint(self):
+        self.assertEqual(graph_endpoint('me/groups'), 'groups')
+        self.assertEqual(graph_endpoint('12345/picture'), 'picture')
+        self.assertEqual(graph_endpoint('me'), '')
+        self.assertEqual(graph_endpoint('/'), '')
+
+    def test_version_key(self):
+        self.assertTrue(version_key('2.10') > version_key('2.9'))
+        self.assertEqual(version_key('3.0'), (3, 0))
+        self.assertEqual(version_key('latest'), None)
+
+
+class ResolveVersionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = FBGraph('token', session=FakeSession(),
+                             version='2.8', routes={'feed': '2.5'})
+
+    def test_default(self):
+        self.assertEqual(self.graph.resolve_version('me'), '2.8')
+
+    def test_routes(self):
+        self.assertEqual(self.graph.resolve_version('me/groups'), '2.3')
+        self.assertEqual(self.graph.resolve_version('me/feed'), '2.5')
+
+    def test_negotiated_over_routes(self):
+        self.graph.negotiated_versions[('feed', 'id')] = '2.4'
+        self.assertEqual(
+            self.graph.resolve_version('me/feed', fields='id'), '2.4')
+        self.assertEqual(
+            self.graph.resolve_version('me/feed', fields='message'), '2.5')
+        self.assertEqual(
+            self.graph.resolve_version('me/feed', fields='id', 
+                                       negotiated=False), '2.5')
+
+    def test_explicit_over_all(self):
+        self.graph.negotiated_versions[('feed', None)] = '2.4'
+        self.assertEqual(self.graph.resolve_version('me/feed', '2.7'), '2.7')
+
+    def test_deprecated_version_replaced(self):
+        self.graph.deprecated_versions.add('2.3')
+        self.assertEqual(self.graph.resolve_version('me/groups'), '2.8')
+
+
+class GetFallbackTest(unittest.TestCase):
+
+    def graph(self, responses):
+        session = FakeSession(responses)
+        return FBGraph('token', session=session, version='2.8'), session
+
+    def test_fallback_is_cached(self):
+        graph, session = self.graph({'2.8': ENDPOINT_DEPRECATED,
+                                     '2.7': ENDPOINT_DEPRECATED})
+
+        self.assertEqual(graph.get('me/feed'), {'id': '2.6'})
+        self.assertEqual(session.versions(), ['2.8', '2.7', '2.6'])
+        self.assertEqual(graph.negotiated_versions, 
+                         {('feed', None): '2.6'})
+
+        graph.get('me/feed')
+        self.assertEqual(session.versions()[3:], ['2.6'])
+
+    def test_fallback_is_bounded_and_exhaustion_cached(self):
+        graph, session = self.graph(dict.fromkeys(
+            ['2.2', '2.3', '2.4', '2.5', '2.6', '2.7', '2.8'],
+            ENDPOINT_DEPRECATED))
+
+        self.assertRaises(FBGraphError, graph.get, 'me/feed')
+        self.assertEqual(len(session.urls), 1 + FB_GRAPH_MAX_FALLBACKS)
+        self.assertIn(('feed', None), graph.exhausted_endpoints)
+
+        self.assertRaises(FBGraphError, graph.get, 'me/feed')
+        self.assertEqual(len(session.urls), 2 + FB_GRAPH_MAX_FALLBACKS)
+
+    def test_fallback_scoped_to_fields(self):
+        graph, session = self.graph({('2.8', 'oldfield'): 
+                                     ENDPOINT_DEPRECATED})
+
+        self.assertEqual(graph.get('me/feed', {'fields': 'oldfield'}),
+                         {'id': '2.7'})
+        self.assertEqual(graph.get('123/feed', {'fields': 'message'}),
+                         {'id': '2.8'})
+        self.assertEqual(session.versions(), ['2.8', '2.7', '2.8'])
+
+    def test_fallback_from_unlisted_version(self):
+        session = FakeSession({'3.0': ENDPOINT_DEPRECATED})
+        graph = FBGraph('token', session=session, version='3.0')
+
+        self.assertEqual(graph.get('me/feed'), {'id': '2.8'})
+        self.assertEqual(session.versions(), ['3.0', '2.8'])
+
+    def test_fallback_to_supplied_versions(self):
+        session = FakeSession({'3.0': ENDPOINT_DEPRECATED})
+        graph = FBGraph('token', session=session, version='3.0',
+                        versions=['2.9', '2.10'])
+
+        self.assertEqual(graph.get('me/feed'), {'id': '2.10'})
+        self.assertEqual(session.versions(), ['3.0', '2.10'])
+
+    def test_deprecated_version_falls_forward(self):
+        graph, session = self.graph({'2.3': VERSION_DEPRECATED})
+
+        self.assertEqual(graph.get('me/groups'), {'id': '2.8'})
+        self.assertEqual(session.versions(), ['2.3', '2.8'])
+        self.assertIn('2.3', graph.deprecated_versions)
+
+        graph.get('me/groups')
+        self.assertEqual(session.versions()[2:], ['2.8'])
+
+    def test_bare_node_not_negotiated(self):
+        graph, session = self.graph({'2.8': ENDPOINT_DEPRECATED})
+
+        self.assertRaises(FBGraphError, graph.get, 'me',
+                          {'fields': 'username'})
+        self.assertEqual(session.versions(), ['2.8'])
+        self.assertEqual(graph.negotiated_versions, {})
+        self.assertEqual(graph.exhausted_endpoints, set())
+
+    def test_version_deprecation_of_default_raises(self):
+        graph, session = self.graph({'2.8': VERSION_DEPRECATED})
+
+        self.assertRaises(FBGraphError, graph.get, 'me/feed')
+        self.assertEqual(session.versions(), ['2.8'])
+
+    def test_explicit_version_not_negotiated(self):
+        graph, session = self.graph({'2.8': ENDPOINT_DEPRECATED})
+
+        self.assertRaises(FBGraphError, graph.get, 'me/feed',
+                          version='2.8')
+        self.assertEqual(session.versions(), ['2.8'])
+        self.assertEqual(graph.negotiated_versions, {})
+
+
+class HelpersVersionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = FakeSession()
+        self.graph = FBGraph('token', session=self.session, version='2.8')
+
+    def test_get_user_groups(self):
+        self.graph.get_user_groups()
+
+        self.assertEqual(self.session.urls, 
+                         ['https://graph.facebook.com/v2.3/me/groups'])
+
+    def test_put_ignores_negotiated_version(self):
+        self.graph.negotiated_versions[('feed', None)] = '2.6'
+
+        self.graph.put_message('me', 'hello')
+        self.graph.put('me/groups')
+
+        self.assertEqual(self.session.urls, 
+                         ['https://graph.facebook.com/v2.8/me/feed',
+                          'https://graph.facebook.com/v2.3/me/groups'])
+
+    def test_delete_ignores_negotiated_version(self):
+        self.graph.negotiated_versions[('', None)] = '2.6'
+
+        self.graph.delete('123')
+        self.graph.delete('123', version='2.5')
+
+        self.assertEqual(self.session.versions(), ['2.8', '2.5'])
+
+
+if __name__ == '__main__':
+    unittest.main()